@@ -0,0 +1,204 @@
+import os
+
+import pytest
+
+from vbyoutube.batch import STAGE_MARKER, Stager, run_jobs
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    source = tmp_path / 'ssd'
+    stage_dir = tmp_path / 'staging'
+    (source / '2024' / 'february').mkdir(parents=True)
+    return source, stage_dir
+
+
+def make_video(directory, name, size):
+    path = directory / name
+    path.write_bytes(b'v' * size)
+    return str(path)
+
+
+def test_paths_outside_source_are_not_staged(dirs, tmp_path):
+    source, stage_dir = dirs
+    stager = Stager(str(source), str(stage_dir), 10_000)
+    assert stager.reserve(make_video(tmp_path, 'local.mov', 100)) is None
+    assert stager.used() == 0
+
+
+def test_non_video_files_are_not_staged(dirs):
+    source, stage_dir = dirs
+    stager = Stager(str(source), str(stage_dir), 10_000)
+    assert stager.reserve(make_video(source, 'notes.txt', 100)) is None
+
+
+def test_uppercase_extension_is_staged(dirs):
+    source, stage_dir = dirs
+    stager = Stager(str(source), str(stage_dir), 10_000)
+    target = stager.reserve(make_video(source, 'CLIP.MOV', 100))
+    assert target == os.path.join(str(stage_dir), 'CLIP.MOV')
+
+
+def test_budget_is_enforced(dirs):
+    source, stage_dir = dirs
+    folder = source / '2024' / 'february'
+    stager = Stager(str(source), str(stage_dir), 1500)
+    first = stager.reserve(make_video(folder, 'a.mov', 1000))
+    assert first == os.path.join(
+        str(stage_dir), '2024', 'february', 'a.mov')
+    assert stager.reserve(make_video(folder, 'b.mov', 1000)) is None
+    assert stager.used() == 1000
+
+
+def test_same_video_is_not_reserved_twice(dirs):
+    source, stage_dir = dirs
+    stager = Stager(str(source), str(stage_dir), 10_000)
+    video = make_video(source, 'a.mov', 100)
+    assert stager.reserve(video)
+    assert stager.reserve(video) is None
+
+
+def test_copy_keeps_mtime(dirs):
+    source, stage_dir = dirs
+    stager = Stager(str(source), str(stage_dir), 10_000)
+    video = make_video(source, 'a.mov', 1000)
+    os.utime(video, (1_700_000_000, 1_700_000_000))
+    target = stager.copy(video, stager.reserve(video))
+    assert os.path.getsize(target) == 1000
+    assert os.path.getmtime(target) == os.path.getmtime(video)
+
+
+def test_copy_leaves_no_part_file_on_failure(dirs):
+    source, stage_dir = dirs
+    stager = Stager(str(source), str(stage_dir), 10_000)
+    video = make_video(source, 'a.mov', 1000)
+    target = stager.reserve(video)
+    stager.cancel()
+    with pytest.raises(InterruptedError):
+        stager.copy(video, target)
+    assert not os.path.exists(target)
+    assert not os.path.exists(target + '.part')
+
+
+def test_evict_releases_budget(dirs):
+    source, stage_dir = dirs
+    stager = Stager(str(source), str(stage_dir), 1500)
+    first = make_video(source, 'a.mov', 1000)
+    second = make_video(source, 'b.mov', 1000)
+    target = stager.copy(first, stager.reserve(first))
+    assert stager.reserve(second) is None
+    stager.evict(target)
+    assert not os.path.exists(target)
+    assert stager.used() == 0
+    assert stager.reserve(second)
+
+
+def staged_files(stage_dir):
+    return sorted(
+        os.path.relpath(os.path.join(root, file), stage_dir)
+        for root, dirs, files in os.walk(stage_dir) for file in files)
+
+
+def test_leftovers_are_removed(dirs):
+    source, stage_dir = dirs
+    Stager(str(source), str(stage_dir), 10_000)
+    (stage_dir / '2024').mkdir()
+    make_video(stage_dir / '2024', 'old.mov', 1000)
+    make_video(stage_dir / '2024', 'old.mov.part', 500)
+    stager = Stager(str(source), str(stage_dir), 1500)
+    assert staged_files(stage_dir) == [STAGE_MARKER]
+    assert os.listdir(stage_dir) == [STAGE_MARKER]
+    assert stager.used() == 0
+
+
+def test_unmarked_directory_is_refused(dirs):
+    source, stage_dir = dirs
+    stage_dir.mkdir()
+    make_video(stage_dir, 'download.mov.part', 500)
+    with pytest.raises(ValueError, match="not a vbyoutube staging"):
+        Stager(str(source), str(stage_dir), 10_000)
+    assert os.path.exists(stage_dir / 'download.mov.part')
+
+
+def test_evict_removes_empty_directories(dirs):
+    source, stage_dir = dirs
+    stager = Stager(str(source), str(stage_dir), 10_000)
+    video = make_video(source / '2024' / 'february', 'a.mov', 100)
+    target = stager.copy(video, stager.reserve(video))
+    stager.evict(target)
+    assert os.listdir(stage_dir) == [STAGE_MARKER]
+
+
+class FakeUploader:
+    """Records uploads, failing or raising for the given metadata files."""
+
+    def __init__(self, fail=(), interrupt=()):
+        self.fail = fail
+        self.interrupt = interrupt
+        self.calls = []
+
+    def upload(self, metadata_file, privacy_status, force, video_file,
+               check_stable=True):
+        self.calls.append({
+            'metadata': metadata_file,
+            'video': video_file,
+            'exists': os.path.isfile(video_file),
+            'check_stable': check_stable,
+            'staged': sorted(os.listdir(os.path.dirname(video_file)))
+        })
+        if metadata_file in self.interrupt:
+            raise KeyboardInterrupt
+        if metadata_file in self.fail:
+            return None
+        return {'id': metadata_file}
+
+
+@pytest.fixture
+def pipeline(dirs):
+    source, stage_dir = dirs
+    jobs = [(f'{name}.json', make_video(source, f'{name}.mov', 1000))
+            for name in 'abc']
+    return jobs, Stager(str(source), str(stage_dir), 10_000), stage_dir
+
+
+def test_next_job_uploads_from_staged_copy(pipeline):
+    jobs, stager, stage_dir = pipeline
+    uploader = FakeUploader()
+    failed = []
+    run_jobs(jobs, uploader, stager, 'private', False, failed)
+
+    assert failed == []
+    # The first video has nothing to overlap with and is read from the SSD
+    assert uploader.calls[0]['video'] == jobs[0][1]
+    assert uploader.calls[0]['check_stable']
+    for call, name in zip(uploader.calls[1:], 'bc'):
+        assert call['video'] == os.path.join(str(stage_dir), f'{name}.mov')
+        assert call['exists']
+        assert not call['check_stable']
+    # While c uploads, b's copy is gone after its successful upload
+    assert 'b.mov' not in uploader.calls[2]['staged']
+    assert staged_files(stage_dir) == [STAGE_MARKER]
+
+
+def test_staged_copy_evicted_after_success_and_failure(pipeline):
+    jobs, stager, stage_dir = pipeline
+    uploader = FakeUploader(fail=('b.json',))
+    failed = []
+    run_jobs(jobs, uploader, stager, 'private', False, failed)
+
+    assert failed == ['b.json']
+    # While c uploads, b's copy is gone after its failed upload
+    assert 'b.mov' not in uploader.calls[2]['staged']
+    assert staged_files(stage_dir) == [STAGE_MARKER]
+    assert stager.used() == 0
+
+
+def test_staging_dir_empty_after_interrupt(pipeline):
+    jobs, stager, stage_dir = pipeline
+    uploader = FakeUploader(interrupt=('b.json',))
+    with pytest.raises(KeyboardInterrupt):
+        run_jobs(jobs, uploader, stager, 'private', False, [])
+
+    assert len(uploader.calls) == 2
+    assert staged_files(stage_dir) == [STAGE_MARKER]
+    assert stager.used() == 0
@@ -0,0 +1,148 @@
+import hashlib
+import os
+import struct
+
+import pytest
+
+from vbyoutube.integrity import (
+    HashingReader, check_iso_bmff, file_signature, preflight)
+
+
+def atom(atom_type, payload=b''):
+    return struct.pack('>I4s', 8 + len(payload), atom_type) + payload
+
+
+def write(tmp_path, data, name='video.mov'):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_well_formed_file(tmp_path):
+    data = (atom(b'ftyp', b'qt  ') + atom(b'wide') + atom(b'junk', b'x' * 4)
+            + atom(b'mdat', b'y' * 100) + atom(b'moov', b'z' * 20))
+    check_iso_bmff(write(tmp_path, data))
+
+
+def test_truncated_file(tmp_path):
+    data = atom(b'ftyp', b'qt  ') + atom(b'moov', b'z' * 20)
+    with pytest.raises(ValueError, match="truncated"):
+        check_iso_bmff(write(tmp_path, data[:-5]))
+
+
+def test_missing_moov(tmp_path):
+    data = atom(b'ftyp', b'qt  ') + atom(b'mdat', b'y' * 100)
+    with pytest.raises(ValueError, match="moov"):
+        check_iso_bmff(write(tmp_path, data))
+
+
+def test_extended_size_atom(tmp_path):
+    payload = b'y' * 100
+    mdat = struct.pack('>I4sQ', 1, b'mdat', 16 + len(payload)) + payload
+    data = atom(b'ftyp', b'qt  ') + atom(b'moov') + mdat
+    check_iso_bmff(write(tmp_path, data))
+
+
+def test_size_zero_atom_extends_to_end(tmp_path):
+    data = (atom(b'ftyp', b'qt  ') + atom(b'moov')
+            + struct.pack('>I4s', 0, b'mdat') + b'y' * 100)
+    check_iso_bmff(write(tmp_path, data))
+
+
+def test_non_printable_atom_type(tmp_path):
+    data = atom(b'ftyp', b'qt  ') + atom(b'\x00\x01\x02\x03') + atom(b'moov')
+    with pytest.raises(ValueError, match="Unexpected atom"):
+        check_iso_bmff(write(tmp_path, data))
+
+
+def test_hashing_reader_reread_after_seek(tmp_path):
+    data = bytes(range(256)) * 40
+    path = write(tmp_path, data, 'video.bin')
+    reader = HashingReader(path)
+    try:
+        for begin in range(0, len(data), 1000):
+            reader.seek(begin)
+            reader.read(1000)
+            # A retry seeks back and reads the same chunk again
+            reader.seek(begin)
+            assert reader.read(1000) == data[begin:begin + 1000]
+    finally:
+        reader.close()
+    assert reader.hexdigest(len(data)) == hashlib.sha256(data).hexdigest()
+
+
+def test_hashing_reader_gap(tmp_path):
+    data = b'x' * 1000
+    reader = HashingReader(write(tmp_path, data, 'video.bin'))
+    try:
+        reader.seek(500)
+        reader.read()
+    finally:
+        reader.close()
+    assert reader.hexdigest(len(data)) is None
+
+
+@pytest.fixture
+def metadata(tmp_path):
+    video = write(tmp_path, atom(b'ftyp', b'qt  ') + atom(b'moov'))
+    description = tmp_path / 'description.txt'
+    description.write_text('Description')
+    thumbnail = tmp_path / 'thumbnail.png'
+    thumbnail.write_bytes(b'png')
+    return {
+        'files': {
+            'video': video,
+            'description': str(description),
+            'thumbnail': str(thumbnail)
+        }
+    }
+
+
+def uploaded(metadata):
+    video = metadata['files']['video']
+    with open(video, 'rb') as f:
+        value = hashlib.sha256(f.read()).hexdigest()
+    metadata['youtube_id'] = 'abc123'
+    metadata['checksum'] = {
+        'algorithm': 'sha256', 'value': value, **file_signature(video)}
+    return metadata
+
+
+def test_preflight_passes(metadata):
+    preflight(metadata, check_stable=False)
+
+
+def test_preflight_refuses_same_size_and_mtime(metadata):
+    with pytest.raises(ValueError, match="modification time"):
+        preflight(uploaded(metadata), check_stable=False)
+
+
+def test_preflight_refuses_same_checksum_with_new_mtime(metadata):
+    metadata = uploaded(metadata)
+    os.utime(metadata['files']['video'], (1_700_000_000, 1_700_000_000))
+    with pytest.raises(ValueError, match="sha256 checksum"):
+        preflight(metadata, check_stable=False)
+
+
+def test_preflight_allows_changed_content(metadata):
+    metadata = uploaded(metadata)
+    metadata['checksum']['value'] = '0' * 64
+    os.utime(metadata['files']['video'], (1_700_000_000, 1_700_000_000))
+    preflight(metadata, check_stable=False)
+
+
+def test_preflight_force_bypasses_reupload_check(metadata):
+    preflight(uploaded(metadata), force=True, check_stable=False)
+
+
+@pytest.mark.parametrize('key', ['description', 'thumbnail'])
+def test_preflight_missing_file(metadata, key):
+    os.remove(metadata['files'][key])
+    with pytest.raises(ValueError, match="file not found"):
+        preflight(metadata, check_stable=False)
+
+
+def test_preflight_empty_video(metadata):
+    open(metadata['files']['video'], 'wb').close()
+    with pytest.raises(ValueError, match="empty"):
+        preflight(metadata, check_stable=False)
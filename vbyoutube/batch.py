@@ -0,0 +1,274 @@
+import click
+import os
+import json
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .youtubeuploader import YouTubeUploader
+from .upload import get_credentials
+from .sync import DEFAULT_SOURCE, is_video_file
+from .integrity import check_reupload
+
+DEFAULT_STAGE_DIR = os.path.expanduser('~/.youtube/staging')
+# Marks a staging directory as owned by vbyoutube
+STAGE_MARKER = '.vbyoutube-staging'
+COPY_BUFFER_SIZE = 16 * 1024 * 1024  # 16MB reads from the SSD
+
+
+class Stager:
+    """Copy videos from the SSD to local disk within a disk budget."""
+
+    def __init__(self, source, stage_dir, budget):
+        self.source = os.path.abspath(source)
+        self.stage_dir = os.path.abspath(stage_dir)
+        self.budget = budget
+        self.staged = {}  # staged path -> size in bytes
+        self.cancelled = threading.Event()
+        self.scan()
+
+    def scan(self):
+        """Claim the staging directory and remove copies left by earlier runs.
+
+        Only a new or empty directory, or one already carrying the marker
+        file, is used, so unrelated files are never deleted.
+        """
+        marker = os.path.join(self.stage_dir, STAGE_MARKER)
+        if os.path.isdir(self.stage_dir) and os.listdir(self.stage_dir) \
+                and not os.path.exists(marker):
+            raise ValueError(
+                f"{self.stage_dir} is not empty and is not a vbyoutube "
+                "staging directory, choose another --stage-dir")
+        os.makedirs(self.stage_dir, exist_ok=True)
+        open(marker, 'a').close()
+
+        for root, dirs, files in os.walk(self.stage_dir, topdown=False):
+            for file in files:
+                path = os.path.join(root, file)
+                if path != marker:
+                    os.remove(path)
+            if root != self.stage_dir:
+                os.rmdir(root)
+
+    def used(self):
+        return sum(self.staged.values())
+
+    def reserve(self, video):
+        """Return a staging path for video, or None to read it directly."""
+        video = os.path.abspath(video)
+        # Only videos left on the SSD by sync need staging
+        if not is_video_file(video) or not os.path.isfile(video):
+            return None
+        if os.path.commonpath([video, self.source]) != self.source:
+            return None
+
+        target = os.path.join(
+            self.stage_dir, os.path.relpath(video, self.source))
+        if target in self.staged:
+            # Same video as one still staged, its eviction would remove it
+            return None
+
+        size = os.path.getsize(video)
+        if self.used() + size > self.budget:
+            return None
+        if shutil.disk_usage(self.stage_dir).free < size:
+            return None
+
+        self.staged[target] = size
+        return target
+
+    def copy(self, video, target):
+        """Copy video to target, runs on the prefetch thread.
+
+        The copy is done in chunks so that cancel() stops it early.
+        """
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        partial = target + '.part'
+        try:
+            with open(video, 'rb') as src, open(partial, 'wb') as dst:
+                while not self.cancelled.is_set():
+                    buf = src.read(COPY_BUFFER_SIZE)
+                    if not buf:
+                        break
+                    dst.write(buf)
+            if self.cancelled.is_set():
+                raise InterruptedError(f"Staging cancelled: {video}")
+            # Keep mtime so recorded checksums match the SSD file
+            shutil.copystat(video, partial)
+            os.replace(partial, target)
+        except Exception:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        return target
+
+    def evict(self, target):
+        """Remove a staged copy and release its share of the budget."""
+        self.staged.pop(target, None)
+        for path in (target, target + '.part'):
+            if os.path.exists(path):
+                os.remove(path)
+
+        # Remove the empty directories copy() created for the target
+        directory = os.path.dirname(target)
+        while directory != self.stage_dir and os.path.isdir(directory) \
+                and not os.listdir(directory):
+            os.rmdir(directory)
+            directory = os.path.dirname(directory)
+
+    def cancel(self):
+        """Stop a running copy."""
+        self.cancelled.set()
+
+    def cleanup(self):
+        """Evict every staged copy and partial file from this run."""
+        for target in list(self.staged):
+            self.evict(target)
+
+
+@click.command()
+@click.argument('metadata', nargs=-1, required=True,
+                type=click.Path(exists=True))
+@click.option('-s', '--source',
+              type=click.Path(),
+              help='SSD directory path',
+              default=DEFAULT_SOURCE,
+              show_default=True)
+@click.option('--stage-dir',
+              type=click.Path(),
+              help='Local directory for staged videos',
+              default=DEFAULT_STAGE_DIR,
+              show_default=True)
+@click.option('-b', '--budget',
+              type=float,
+              help='Disk budget for staged videos in GB',
+              default=20,
+              show_default=True)
+@click.option(
+    '-p',
+    '--privacy',
+    type=click.Choice(
+        ['private', 'public', 'unlisted'], case_sensitive=False),
+    default='private',
+    help='Video privacy status (default: private)'
+)
+@click.option(
+    '-f',
+    '--force',
+    is_flag=True,
+    help='Upload even if a video was already uploaded'
+)
+def batch(metadata, source, stage_dir, budget, privacy, force):
+    """Upload several videos, staging the next one from the SSD meanwhile.
+
+    While video N uploads, video N+1 is copied from the SSD to the staging
+    directory so that SSD reads overlap with the upload. Videos that do not
+    fit in the budget are read directly from their metadata path. Staged
+    copies are removed as soon as their upload finishes, and copies left in
+    the staging directory by an interrupted run are removed at startup.
+    Already uploaded videos are skipped using the same rule as upload.
+    """
+    jobs = []
+    failed = []
+    for metadata_file in metadata:
+        try:
+            with open(metadata_file, 'r') as f:
+                info = json.load(f)
+            video = info['files']['video']
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            click.echo(f"Skipping {metadata_file}: invalid metadata ({e!r})")
+            failed.append(metadata_file)
+            continue
+        try:
+            # Same re-upload rule as upload, checked before staging the video
+            check_reupload(info, video, force=force)
+        except ValueError as e:
+            click.echo(f"Skipping {metadata_file}: {e}")
+            continue
+        except OSError:
+            # Missing video, reported by pre-flight during upload
+            pass
+        jobs.append((metadata_file, video))
+
+    invalid = len(failed)
+    if jobs:
+        try:
+            credentials = get_credentials()
+            uploader = YouTubeUploader(credentials)
+            stager = Stager(source, stage_dir, int(budget * 1024 ** 3))
+        except Exception as e:
+            raise click.ClickException(f"An error occurred: {str(e)}")
+        run_jobs(jobs, uploader, stager, privacy, force, failed)
+    else:
+        click.echo("Nothing to upload.")
+
+    click.echo(
+        f"\nBatch completed: {len(jobs) - len(failed) + invalid} uploaded, "
+        f"{len(failed)} failed")
+    if failed:
+        raise click.ClickException(
+            "Failed uploads:\n" + "\n".join(failed))
+
+
+def run_jobs(jobs, uploader, stager, privacy, force, failed):
+    """Upload jobs in order while the next video is staged."""
+    pending = {}  # job index -> (future, staged path)
+    executor = ThreadPoolExecutor(max_workers=1)
+
+    def prefetch(index):
+        if index >= len(jobs) or index in pending:
+            return
+        video = jobs[index][1]
+        try:
+            target = stager.reserve(video)
+        except OSError as e:
+            click.echo(f"Warning: Cannot stage {video} ({e}), reading from SSD")
+            return
+        if target:
+            pending[index] = (
+                executor.submit(stager.copy, video, target), target)
+
+    try:
+        for index, (metadata_file, video) in enumerate(jobs):
+            click.echo(f"\n[{index + 1}/{len(jobs)}] {metadata_file}")
+
+            video_file, target = video, None
+            if index in pending:
+                future, target = pending.pop(index)
+                try:
+                    video_file = future.result()
+                except Exception as e:
+                    click.echo(f"Warning: Staging failed ({e}), reading from SSD")
+                    stager.evict(target)
+                    video_file, target = video, None
+
+            # Stage the next video while this one uploads
+            prefetch(index + 1)
+
+            try:
+                response = uploader.upload(
+                    metadata_file=metadata_file,
+                    privacy_status=privacy.lower(),
+                    force=force,
+                    video_file=video_file,
+                    # A finished staged copy cannot still be changing
+                    check_stable=target is None
+                )
+                if response is None:
+                    failed.append(metadata_file)
+            except Exception as e:
+                click.echo(f"An error occurred: {str(e)}")
+                failed.append(metadata_file)
+            finally:
+                if target:
+                    stager.evict(target)
+    finally:
+        # Stop a running copy (e.g. on Ctrl-C) and remove everything staged
+        stager.cancel()
+        for future, target in pending.values():
+            future.cancel()
+        executor.shutdown(wait=True)
+        stager.cleanup()
+
+
+if __name__ == '__main__':
+    batch()
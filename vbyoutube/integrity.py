@@ -0,0 +1,187 @@
+import os
+import time
+import struct
+import hashlib
+
+
+CHECKSUM_ALGORITHM = 'sha256'
+CHECKSUM_BUFFER_SIZE = 16 * 1024 * 1024
+
+ISO_BMFF_EXTENSIONS = ('.mov', '.mp4', '.m4v')
+
+
+class HashingReader:
+    """File wrapper that hashes bytes as the uploader reads them.
+
+    The uploader may seek back and re-read a chunk after a retry, so only
+    bytes beyond what has already been hashed are fed into the digest.
+    """
+
+    def __init__(self, path, algorithm=CHECKSUM_ALGORITHM):
+        self._fd = open(path, 'rb')
+        self._hash = hashlib.new(algorithm)
+        self._hashed = 0
+        self._gap = False
+        self.algorithm = algorithm
+
+    def read(self, size=-1):
+        offset = self._fd.tell()
+        data = self._fd.read(size)
+        end = offset + len(data)
+        if offset > self._hashed:
+            # Reads skipped ahead, the digest can no longer cover the file
+            self._gap = True
+        elif end > self._hashed:
+            self._hash.update(data[self._hashed - offset:])
+            self._hashed = end
+        return data
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        return self._fd.seek(offset, whence)
+
+    def tell(self):
+        return self._fd.tell()
+
+    def close(self):
+        self._fd.close()
+
+    @property
+    def hashed_bytes(self):
+        return self._hashed
+
+    def hexdigest(self, expected_size):
+        """Return the digest if it covers exactly expected_size bytes."""
+        if self._gap or self._hashed != expected_size:
+            return None
+        return self._hash.hexdigest()
+
+
+def file_signature(path):
+    """Return size and modification time used to match recorded checksums."""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+
+def file_checksum(path, algorithm=CHECKSUM_ALGORITHM):
+    """Hash a whole file, used only when a recorded checksum must be compared."""
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        for buf in iter(lambda: f.read(CHECKSUM_BUFFER_SIZE), b''):
+            digest.update(buf)
+    return digest.hexdigest()
+
+
+def check_size_stable(path, interval=2.0):
+    """Make sure the file is not still being written."""
+    before = os.stat(path)
+    time.sleep(interval)
+    after = os.stat(path)
+    if (before.st_size, before.st_mtime) != (after.st_size, after.st_mtime):
+        raise ValueError(
+            f"Video file is still changing: {path} "
+            f"({before.st_size} -> {after.st_size} bytes)")
+
+
+def check_iso_bmff(path):
+    """Walk the top-level atoms of a .mov/.mp4 file without reading payloads."""
+    size = os.path.getsize(path)
+    found = set()
+    with open(path, 'rb') as f:
+        offset = 0
+        while offset < size:
+            f.seek(offset)
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(
+                    f"Truncated atom header at byte {offset} in {path}")
+            atom_size, atom_type = struct.unpack('>I4s', header)
+            # Any 4 printable ASCII characters are a valid atom type
+            if not all(0x20 <= c <= 0x7e for c in atom_type):
+                raise ValueError(
+                    f"Unexpected atom {atom_type!r} at byte {offset} in {path}")
+            if atom_size == 1:
+                extended = f.read(8)
+                if len(extended) < 8:
+                    raise ValueError(
+                        f"Truncated atom header at byte {offset} in {path}")
+                atom_size = struct.unpack('>Q', extended)[0]
+            elif atom_size == 0:
+                # Atom extends to the end of the file
+                atom_size = size - offset
+            if atom_size < 8:
+                raise ValueError(
+                    f"Invalid atom size {atom_size} at byte {offset} in {path}")
+            found.add(atom_type)
+            offset += atom_size
+    if offset != size:
+        raise ValueError(
+            f"Video file looks truncated: atoms end at byte {offset} "
+            f"but file is {size} bytes ({path})")
+    if b'moov' not in found and b'moof' not in found:
+        raise ValueError(f"No 'moov' atom found in {path}")
+
+
+def check_container_header(path):
+    """Cheap sanity check of the video container header."""
+    with open(path, 'rb') as f:
+        magic = f.read(12)
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ISO_BMFF_EXTENSIONS:
+        check_iso_bmff(path)
+    elif ext in ('.mkv', '.webm'):
+        if not magic.startswith(b'\x1a\x45\xdf\xa3'):
+            raise ValueError(f"Missing EBML header in {path}")
+    elif ext == '.avi':
+        if magic[:4] != b'RIFF' or magic[8:12] != b'AVI ':
+            raise ValueError(f"Missing RIFF/AVI header in {path}")
+
+
+def check_reupload(metadata, video, force=False):
+    """Refuse a video that matches the checksum recorded in metadata.
+
+    Metadata records the checksum of the last upload together with the
+    file size and mtime. An unchanged file is matched on size and mtime
+    without reading it. When only the mtime differs (e.g. re-copied off
+    the SSD without -p), the file is hashed and compared to the checksum.
+    """
+    recorded = metadata.get('checksum')
+    if not recorded or not metadata.get('youtube_id') or force:
+        return
+    signature = file_signature(video)
+    algorithm = recorded.get('algorithm', CHECKSUM_ALGORITHM)
+    match = None
+    if recorded.get('size') == signature['size']:
+        if recorded.get('mtime') == signature['mtime']:
+            match = "the same size and modification time"
+        elif file_checksum(video, algorithm) == recorded.get('value'):
+            match = f"the same {algorithm} checksum"
+    if match:
+        raise ValueError(
+            f"A file with {match} was already uploaded as "
+            f"{metadata['youtube_id']}. Use --force to upload it again.")
+
+
+def preflight(metadata, force=False, video_file=None, check_stable=True):
+    """Run cheap checks on the inputs before opening an upload session.
+
+    check_stable can be turned off for files known to be complete, e.g.
+    staged copies, to skip the wait for a stable size.
+    """
+    files = metadata.get('files', {})
+    video = video_file or files.get('video')
+    if not video or not os.path.isfile(video):
+        raise ValueError(f"Video file not found: {video}")
+    if os.path.getsize(video) == 0:
+        raise ValueError(f"Video file is empty: {video}")
+
+    if 'description' not in files:
+        raise ValueError("No description file set in metadata")
+    for key in ('description', 'thumbnail'):
+        if key in files and not os.path.isfile(files[key]):
+            raise ValueError(f"{key.capitalize()} file not found: {files[key]}")
+
+    check_reupload(metadata, video, force=force)
+
+    if check_stable:
+        check_size_stable(video)
+    check_container_header(video)
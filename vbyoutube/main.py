@@ -2,6 +2,7 @@ import click
 from .upload import upload
 from .update import update
 from .sync import sync
+from .batch import batch
 from .analytics import stats, videos
 
 CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
@@ -15,6 +16,7 @@ def main():
 main.add_command(upload)
 main.add_command(update)
 main.add_command(sync)
+main.add_command(batch)
 main.add_command(stats)
 main.add_command(videos)
 if __name__ == '__main__':
@@ -5,17 +5,44 @@ from pathlib import Path
 import json
 import time
 
+# Default SSD and local directories
+DEFAULT_SOURCE = "/Volumes/T7 Shield/youtube_10xphysics"
+DEFAULT_DESTINATION = os.path.expanduser("~/youtube_10xphysics")
+
+# Video files stay on the SSD and are never synced, in either case
+VIDEO_EXTENSIONS = ['.mp4', '.mov', '.avi',
+                    '.mkv', '.wmv', '.flv', '.webm', '.m4v']
+
+
+
+def case_insensitive_pattern(ext):
+    """Build an rsync pattern matching ext in any case, e.g. *.[mM][oO][vV]."""
+    return '*' + ''.join(
+        f'[{c.lower()}{c.upper()}]' if c.isalpha() else c for c in ext)
+
+
+# Define excluded patterns
+EXCLUDE_PATTERNS = [case_insensitive_pattern(ext) for ext in VIDEO_EXTENSIONS] + [
+    '.DS_Store',  # Exclude Mac system files
+    '._*',  # Exclude hidden files
+]
+
+
+def is_video_file(path):
+    """Check if a file is a video excluded from sync."""
+    return path.lower().endswith(tuple(VIDEO_EXTENSIONS))
+
 
 @click.command()
 @click.option('-s', '--source',
               type=click.Path(exists=True),
               help='SSD directory path',
-              default="/Volumes/T7 Shield/youtube_10xphysics",
+              default=DEFAULT_SOURCE,
               show_default=True)
 @click.option('-d', '--destination',
               type=click.Path(),
               help='Local directory path',
-              default=os.path.expanduser("~/youtube_10xphysics"),
+              default=DEFAULT_DESTINATION,
               show_default=True)
 @click.option('--force-direction',
               type=click.Choice(['to-local', 'to-ssd']),
@@ -31,23 +58,9 @@ def sync(source, destination, force_direction):
     # Create destination if it doesn't exist
     os.makedirs(destination, exist_ok=True)
 
-    # Define excluded patterns
-    exclude_patterns = [
-        '*.mp4',
-        '*.mov',
-        '*.avi',
-        '*.mkv',
-        '*.wmv',
-        '*.flv',
-        '*.webm',
-        '*.m4v',
-        '.DS_Store',  # Exclude Mac system files
-        '._*',  # Exclude hidden files
-    ]
-
     # Build rsync exclude arguments
     exclude_args = ' '.join(
-        [f'--exclude="{pattern}"' for pattern in exclude_patterns])
+        [f'--exclude="{pattern}"' for pattern in EXCLUDE_PATTERNS])
 
     # Determine sync direction based on timestamps if not forced
     if not force_direction:
@@ -100,7 +113,7 @@ def get_latest_modification_time(directory):
     latest_time = 0
     for root, dirs, files in os.walk(directory):
         for file in files:
-            if not any(file.endswith(ext) for ext in ['.mp4', '.mov', '.avi', '.mkv', '.wmv', '.flv', '.webm', '.m4v']):
+            if not is_video_file(file):
                 path = os.path.join(root, file)
                 latest_time = max(latest_time, os.path.getmtime(path))
     return latest_time
@@ -84,7 +84,13 @@ def get_credentials():
     default='private',
     help='Video privacy status (default: private)'
 )
-def upload(metadata, privacy):
+@click.option(
+    '-f',
+    '--force',
+    is_flag=True,
+    help='Upload even if this file was already uploaded'
+)
+def upload(metadata, privacy, force):
     """Upload a video to YouTube with metadata."""
     try:
         credentials = get_credentials()
@@ -92,7 +98,8 @@ def upload(metadata, privacy):
 
         upload_response = uploader.upload(
             metadata_file=metadata,
-            privacy_status=privacy.lower()
+            privacy_status=privacy.lower(),
+            force=force
         )
 
     except Exception as e:
@@ -2,11 +2,12 @@ import os
 import json
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
 import google.oauth2.credentials
 import google_auth_oauthlib.flow
 import googleapiclient.discovery
 from tqdm import tqdm
+from .integrity import HashingReader, file_signature, preflight
 
 
 class YouTubeUploader:
@@ -25,10 +26,23 @@ class YouTubeUploader:
         with open(file_path, 'r') as f:
             return f.read().strip()
 
-    def upload(self, metadata_file, privacy_status="private"):
+    def upload(self, metadata_file, privacy_status="private", force=False,
+               video_file=None, check_stable=True):
+        """Upload the video described by metadata_file.
+
+        video_file overrides metadata['files']['video'], e.g. to read a
+        staged local copy. The metadata file keeps its original path.
+        check_stable=False skips the pre-flight wait for a stable size.
+        """
+        reader = None
         try:
             # Read metadata
             metadata = self.read_metadata(metadata_file)
+            video_file = video_file or metadata['files']['video']
+
+            # Catch truncated or missing inputs before opening a session
+            preflight(metadata, force=force, video_file=video_file,
+                      check_stable=check_stable)
 
             # Read description from file
             with open(metadata['files']['description'], 'r') as f:
@@ -63,8 +77,11 @@ class YouTubeUploader:
                 }
             }
 
-            media = MediaFileUpload(
-                metadata['files']['video'],
+            # Hash the same buffers that are sent, no second read pass
+            signature = file_signature(video_file)
+            reader = HashingReader(video_file)
+            media = MediaIoBaseUpload(
+                reader,
                 chunksize=1024 * 1024,  # 1MB chunks
                 resumable=True,
                 mimetype='video/*'
@@ -97,6 +114,15 @@ class YouTubeUploader:
             # Save video ID to metadata
             metadata['youtube_id'] = video_id
             metadata['url'] = video_url  # Also save URL in metadata
+            checksum = reader.hexdigest(signature['size'])
+            if checksum:
+                metadata['checksum'] = {
+                    'algorithm': reader.algorithm,
+                    'value': checksum,
+                    **signature
+                }
+            else:
+                print("Warning: Checksum did not cover the whole file, not saved")
             with open(metadata_file, 'w') as f:
                 json.dump(metadata, f, indent=4)
 
@@ -123,6 +149,10 @@ class YouTubeUploader:
             print(f"An error occurred: {err}")
             return None
 
+        finally:
+            if reader:
+                reader.close()
+
     def update_video_settings(self, video_id, metadata):
         """Update additional video settings after upload."""
         try: